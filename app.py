@@ -1,29 +1,270 @@
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, request, render_template, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
+import os
 import pickle
 import numpy as np
 import pandas as pd
 import io
+import orjson
+import csv
+import threading
+import queue
+import re
+import operator
+import logging
 
-# Load model and scaler
+logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+log = logging.getLogger("bcpred")
+log.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+class OnnxClassifier:
+    """Minimal predict_proba wrapper around an onnxruntime session"""
+
+    def __init__(self, path):
+        so = ort.SessionOptions()
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        so.intra_op_num_threads = 1  # one request per worker thread
+        self.session = ort.InferenceSession(path, sess_options=so, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_proba(self, X):
+        probabilities = self.session.run(["probabilities"], {self.input_name: X})[0]
+        # float32 tree averaging can land just above 1
+        return np.clip(probabilities, 0, 1, out=probabilities)
+
+
+def scale_features(x):
+    """Standardize a float32 feature matrix in place with the trained scaler stats"""
+    np.subtract(x, MEAN, out=x)
+    np.divide(x, SCALE, out=x)
+    return x
+
+
+# Per-thread buffers reused across requests
+_local = threading.local()
+
+
+def confidence_buffer(n_rows):
+    """Return a float32 view of n_rows from this thread's reusable confidence buffer"""
+    buf = getattr(_local, "confidences", None)
+    if buf is None or buf.shape[0] < n_rows:
+        buf = _local.confidences = np.empty(max(n_rows, CSV_CHUNK_ROWS), dtype=np.float32)
+    return buf[:n_rows]
+
+
+def iter_in_background(iterable, maxsize=2):
+    """Yield items produced on a background thread through a bounded queue"""
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def offer(item):
+        """Put item unless the consumer has gone away; False once stopped"""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not offer(item):
+                    return
+            offer(done)
+        except Exception as e:
+            offer(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+if njit is not None:
+    # Serial on purpose: request, batcher and CSV threads call this concurrently,
+    # which Numba's default parallel (workqueue) threading layer does not allow
+    @njit(fastmath=True, cache=True)
+    def linear_proba_kernel(X, w, b, out):
+        """Fused dot + bias + sigmoid per row for a folded binary linear model"""
+        for i in range(X.shape[0]):
+            score = b
+            for j in range(X.shape[1]):
+                score += X[i, j] * w[j]
+            positive = 1.0 / (1.0 + np.exp(-score))
+            out[i, 0] = 1.0 - positive
+            out[i, 1] = positive
+else:
+    linear_proba_kernel = None
+
+
+def is_binary_logistic(model):
+    """True when model.predict_proba is sigmoid(X @ coef_.T + intercept_) over two classes"""
+    if not hasattr(model, "predict_proba") or getattr(model, "coef_", None) is None:
+        return False
+    if model.coef_.shape[0] != 1:
+        return False
+    if type(model).__name__ in ("LogisticRegression", "LogisticRegressionCV"):
+        return getattr(model, "multi_class", "auto") != "multinomial"
+    # SGDClassifier: only the logistic loss yields sigmoid probabilities
+    return getattr(model, "loss", None) in ("log_loss", "log")
+
+
+def predict_proba(X):
+    """Class probabilities for a raw (unscaled) float32 feature matrix"""
+    if _W is not None:
+        # Linear model with the scaler folded into its weights: one pass over X
+        if linear_proba_kernel is not None:
+            out = np.empty((X.shape[0], 2), dtype=np.float32)
+            linear_proba_kernel(X, _W[0], _B[0], out)
+            return out
+        positive = 1.0 / (1.0 + np.exp(-(X @ _W.T + _B)))
+        return np.hstack([1.0 - positive, positive])
+    return model.predict_proba(scale_features(X))
+
+
+# Micro-batching of single-row /predict calls: a lone row is scored immediately,
+# rows that queued up meanwhile (up to BATCH_MAX_SIZE) share one model call
+BATCH_MAX_SIZE = 64
+BATCH_RESULT_TIMEOUT = 0.1
+
+_batch_queue = None
+_batcher_pid = None
+_batcher_lock = threading.Lock()
+
+
+def _run_batcher(pending):
+    """Drain queued rows into batches and fan the probabilities back out"""
+    while True:
+        batch = [pending.get()]
+        while len(batch) < BATCH_MAX_SIZE:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            probabilities = predict_proba(np.vstack([row for row, _, _ in batch]))
+            for (_, done, result), row_probabilities in zip(batch, probabilities):
+                result['probabilities'] = row_probabilities.reshape(1, -1)
+                done.set()
+        except Exception as e:
+            for _, done, result in batch:
+                result['error'] = e
+                done.set()
+
+
+def batched_predict_proba(row):
+    """Class probabilities for one (1, n_features) row via the shared batcher thread"""
+    global _batch_queue, _batcher_pid
+    # Start the batcher lazily per process (workers are forked after import)
+    with _batcher_lock:
+        if _batcher_pid != os.getpid():
+            _batch_queue = queue.Queue()
+            _batcher_pid = os.getpid()
+            threading.Thread(target=_run_batcher, args=(_batch_queue,), daemon=True).start()
+
+    done = threading.Event()
+    result = {}
+    _batch_queue.put((row, done, result))
+    if not done.wait(BATCH_RESULT_TIMEOUT):
+        log.warning("⚠️ Batcher timed out, predicting directly")
+        # The batcher may still read this row, so scale a private copy
+        return predict_proba(row.copy())
+    if 'error' in result:
+        raise result['error']
+    return result['probabilities']
+
+
+# Read pickles through a 1MB buffer instead of the default 8KB
+PICKLE_BUFFER_SIZE = 1024 * 1024
+
+# Serve the int8 quantized ONNX model when enabled and exported (VNNI-capable hosts)
+USE_INT8_MODEL = os.environ.get("USE_INT8_MODEL", "0") == "1"
+
+# Load model and scaler (ONNX / npz when available, pickle otherwise)
 try:
-    with open("model.pkl", "rb") as f:
-        model = pickle.load(f)
-    with open("scaler.pkl", "rb") as f:
-        scaler = pickle.load(f)
-    print("✅ Model and scaler loaded successfully!")
+    if ort is not None and USE_INT8_MODEL and os.path.exists("model.int8.onnx"):
+        model = OnnxClassifier("model.int8.onnx")
+        log.info("⚙️ Using ONNX Runtime with the int8 quantized model")
+    elif ort is not None and os.path.exists("model.onnx"):
+        model = OnnxClassifier("model.onnx")
+        log.info("⚙️ Using ONNX Runtime for inference")
+    else:
+        with open("model.pkl", "rb", buffering=PICKLE_BUFFER_SIZE) as f:
+            model = pickle.load(f)
+
+    if os.path.exists("scaler.npz"):
+        with np.load("scaler.npz") as stats:
+            MEAN = np.ascontiguousarray(stats["mean"], dtype=np.float32)
+            SCALE = np.ascontiguousarray(stats["scale"], dtype=np.float32)
+    else:
+        with open("scaler.pkl", "rb", buffering=PICKLE_BUFFER_SIZE) as f:
+            scaler = pickle.load(f)
+        MEAN = np.ascontiguousarray(scaler.mean_, dtype=np.float32)
+        SCALE = np.ascontiguousarray(scaler.scale_, dtype=np.float32)
+    log.info("✅ Model and scaler loaded successfully!")
+
+    # Fold mean/scale into binary logistic models: w' = w / scale, b' = b - sum(w * mean / scale)
+    if is_binary_logistic(model):
+        _W = np.ascontiguousarray(model.coef_ / SCALE, dtype=np.float32)
+        _B = np.asarray(model.intercept_ - (model.coef_ * MEAN / SCALE).sum(axis=1), dtype=np.float32)
+        log.info("🧮 Scaler folded into linear model weights")
+    else:
+        _W = None
+        _B = None
+
+    # Keep any sklearn linear weights in float32 so float32 inputs stay on SGEMM
+    if hasattr(model, "coef_"):
+        model.coef_ = np.ascontiguousarray(model.coef_, dtype=np.float32)
+        model.intercept_ = np.asarray(model.intercept_, dtype=np.float32)
+
+    # Warm up once so the first request doesn't pay for lazy imports, kernel
+    # compilation (Numba/ONNX) and page-faulting the model weights
+    try:
+        predict_proba(np.zeros((8, MEAN.shape[0]), dtype=np.float32))
+        log.info("🔥 Model warmed up")
+    except Exception as e:
+        log.warning("⚠️ Model warmup failed: %s", e)
     
     # Get the number of features the scaler expects
-    expected_features = scaler.n_features_in_
-    print(f"🔢 Model expects {expected_features} features")
+    expected_features = MEAN.shape[0]
+    log.info("🔢 Model expects %d features", expected_features)
     
 except FileNotFoundError as e:
-    print(f"❌ Error loading model files: {e}")
+    log.error("❌ Error loading model files: %s", e)
     model = None
-    scaler = None
+    MEAN = None
+    SCALE = None
+    _W = None
+    _B = None
     expected_features = 30
 
 app = Flask(__name__)
 
+# Reject oversized uploads before they are parsed (413)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024
+
 # Original 30 feature columns (for reference)
 ALL_FEATURE_COLUMNS = [
     'radius_mean', 'texture_mean', 'perimeter_mean', 'area_mean', 'smoothness_mean',
@@ -36,7 +277,58 @@ ALL_FEATURE_COLUMNS = [
 ]
 
 # Use only the number of features the model expects
-FEATURE_COLUMNS = ALL_FEATURE_COLUMNS[:expected_features] if model else ALL_FEATURE_COLUMNS
+FEATURE_COLUMNS = tuple(ALL_FEATURE_COLUMNS[:expected_features] if model else ALL_FEATURE_COLUMNS)
+
+# Fetch every feature from a request dict in one call
+FEATURE_GETTER = operator.itemgetter(*FEATURE_COLUMNS)
+
+# CSV uploads: rows inspected for column selection, and rows parsed per chunk
+CSV_SAMPLE_ROWS = 500
+CSV_CHUNK_ROWS = 65536
+
+# Columns to exclude from features (case-insensitive substring match)
+EXCLUDE_COLUMNS_RE = re.compile(
+    r"id|diagnosis|target|label|class|outcome|result|patient|sample|index|unnamed|row",
+    re.IGNORECASE
+)
+
+
+def select_feature_columns(csv_data):
+    """Split CSV columns into excluded ones and numeric feature candidates"""
+    # Filter out excluded columns
+    feature_candidates = []
+    excluded_columns = []
+
+    for col in csv_data.columns:
+        if EXCLUDE_COLUMNS_RE.search(col):
+            excluded_columns.append(col)
+            log.debug("🗑️ Excluding column: %s", col)
+        else:
+            feature_candidates.append(col)
+
+    log.debug("📊 Feature candidates: %d columns", len(feature_candidates))
+    log.debug("🗑️ Excluded columns: %s", excluded_columns)
+
+    # Test which columns are numeric
+    numeric_columns = []
+    for col in feature_candidates:
+        try:
+            # Try to convert to numeric
+            numeric_test = pd.to_numeric(csv_data[col], errors='coerce')
+            valid_ratio = numeric_test.notna().sum() / len(numeric_test)
+
+            if valid_ratio >= 0.9:  # At least 90% valid numeric values
+                numeric_columns.append(col)
+                log.debug("✅ Numeric column: %s (%.1f%% valid)", col, valid_ratio * 100)
+            else:
+                log.debug("❌ Non-numeric column: %s (%.1f%% valid)", col, valid_ratio * 100)
+
+        except Exception as e:
+            log.debug("❌ Error testing column %s: %s", col, e)
+            continue
+
+    return excluded_columns, numeric_columns
+
 
 @app.route("/")
 def home():
@@ -46,69 +338,74 @@ def home():
 def predict():
     """Handle manual prediction requests using trained model"""
     try:
-        print("📥 Received manual prediction request")
+        log.debug("📥 Received manual prediction request")
         
         # Check if model is loaded
-        if model is None or scaler is None:
-            print("❌ Model or scaler not loaded")
+        if model is None or MEAN is None:
+            log.error("❌ Model or scaler not loaded")
             return jsonify({
                 'error': 'Model not loaded. Please check server configuration.'
             }), 500
         
         # Get JSON data from request
         data = request.get_json()
-        print(f"📊 Received data: {len(data) if data else 0} features")
+        log.debug("📊 Received data: %d features", len(data) if isinstance(data, dict) else 0)
         
         if not data:
             return jsonify({
                 'error': 'No data provided. Please fill all required fields.'
             }), 400
         
-        # Extract features in the correct order
-        features = []
-        missing_features = []
+        if not isinstance(data, dict):
+            return jsonify({
+                'error': 'Invalid data format. Please send feature values as a JSON object.'
+            }), 400
+        
+        # Extract features in the correct order (absent keys fall back to None)
+        try:
+            values = FEATURE_GETTER(data)
+        except KeyError:
+            values = tuple(data.get(feature) for feature in FEATURE_COLUMNS)
         
-        for feature in FEATURE_COLUMNS:
-            if feature in data and data[feature] is not None and str(data[feature]).strip() != '':
+        # Convert to a (1, n_features) float32 row; null or blank values become NaN (missing)
+        try:
+            features_array = np.fromiter(
+                (np.nan if value is None or str(value).strip() == '' else float(value) for value in values),
+                dtype=np.float32,
+                count=len(values)
+            ).reshape(1, -1)
+        except (ValueError, TypeError):
+            for feature, value in zip(FEATURE_COLUMNS, values):
                 try:
-                    features.append(float(data[feature]))
+                    if value is not None and str(value).strip() != '':
+                        float(value)
                 except (ValueError, TypeError):
                     return jsonify({
                         'error': f'Invalid value for {feature}. Please enter a valid number.'
                     }), 400
-            else:
-                missing_features.append(feature)
+            raise
         
+        missing_features = [FEATURE_COLUMNS[i] for i in np.flatnonzero(np.isnan(features_array[0]))]
         if missing_features:
-            print(f"❌ Missing features: {missing_features[:5]}...")
+            log.debug("❌ Missing features: %s...", missing_features[:5])
             return jsonify({
                 'error': f'Missing required features: {", ".join(missing_features[:5])}{"..." if len(missing_features) > 5 else ""}'
             }), 400
         
-        # Convert to numpy array and reshape
-        features_array = np.array([features])
-        print(f"🔢 Features array shape: {features_array.shape}")
+        log.debug("🔢 Features array shape: %s", features_array.shape)
         
-        # Scale features using trained scaler
-        features_scaled = scaler.transform(features_array)
-        print(f"⚖️ Features scaled successfully")
+        # Make prediction using trained model (batched with concurrent requests)
+        probabilities = batched_predict_proba(features_array)
+        prediction = int(probabilities[0].argmax())
+        log.debug("🔮 Raw prediction: %s", prediction)
         
-        # Make prediction using trained model
-        prediction = model.predict(features_scaled)[0]
-        print(f"🔮 Raw prediction: {prediction}")
-        
-        # Get prediction probabilities for confidence - FIXED
-        try:
-            probabilities = model.predict_proba(features_scaled)  # Get first (and only) sample
-            confidence = max(probabilities)
-            print(f"📊 Confidence: {confidence:.3f}")
-        except:
-            confidence = 0.85
-            print("⚠️ Using default confidence")
+        # Confidence is the probability of the predicted class
+        confidence = float(probabilities[0, prediction])
+        log.debug("📊 Confidence: %.3f", confidence)
         
         # Convert prediction to readable format
         result = "Malignant" if prediction == 1 else "Benign"
-        print(f"✅ Final prediction: {result}")
+        log.debug("✅ Final prediction: %s", result)
         
         return jsonify({
             'prediction': result,
@@ -116,8 +413,10 @@ def predict():
             'status': 'success'
         })
         
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Error in predict endpoint: {str(e)}")
+        log.exception("❌ Error in predict endpoint: %s", e)
         return jsonify({
             'error': f'Prediction failed: {str(e)}'
         }), 500
@@ -126,26 +425,26 @@ def predict():
 def predict_csv():
     """Handle CSV file prediction requests - PROPERLY DROP UNUSED COLUMNS"""
     try:
-        print("📥 Received CSV prediction request")
+        log.debug("📥 Received CSV prediction request")
         
         # Check if model is loaded
-        if model is None or scaler is None:
-            print("❌ Model or scaler not loaded")
+        if model is None or MEAN is None:
+            log.error("❌ Model or scaler not loaded")
             return jsonify({
                 'error': 'Model not loaded. Please check server configuration.'
             }), 500
         
-        print(f"🎯 Model expects {expected_features} features")
+        log.debug("🎯 Model expects %d features", expected_features)
         
         # Check if file is in request
         if 'file' not in request.files:
-            print("❌ No file in request")
+            log.debug("❌ No file in request")
             return jsonify({
                 'error': 'No file uploaded. Please select a CSV file.'
             }), 400
         
         file = request.files['file']
-        print(f"📁 Received file: {file.filename}")
+        log.debug("📁 Received file: %s", file.filename)
         
         if file.filename == '':
             return jsonify({
@@ -157,71 +456,69 @@ def predict_csv():
                 'error': 'Invalid file format. Please upload a CSV file.'
             }), 400
         
-        # Read CSV file with multiple encoding attempts
+        # Parse straight from the uploaded (already spooled) stream; pandas decodes
+        # inline while parsing and every read rewinds the stream first
         try:
-            file_content = None
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            
-            for encoding in encodings:
-                try:
-                    file_content = file.read().decode(encoding)
-                    print(f"✅ Successfully decoded with {encoding}")
-                    break
-                except UnicodeDecodeError:
-                    file.seek(0)  # Reset file pointer for next attempt
-                    continue
-            
-            if file_content is None:
-                return jsonify({
-                    'error': 'Unable to decode CSV file. Please save as UTF-8 format.'
-                }), 400
+            file_content = file.stream
+            head = file_content.read(4096)
+            # Skip leading blank blocks so the sniff window holds real content
+            while head and not head.strip():
+                head = file_content.read(4096)
+            if log.isEnabledFor(logging.DEBUG):
+                size = file_content.seek(0, io.SEEK_END)
+                file_content.seek(0)
+                log.debug("📄 File content length: %d bytes", size)
             
-            print(f"📄 File content length: {len(file_content)} characters")
-            
-            if len(file_content.strip()) == 0:
+            if not head:
                 return jsonify({
                     'error': 'CSV file is empty.'
                 }), 400
             
-            # Try different CSV parsing approaches
+            # Undecodable bytes (e.g. latin-1 headers) become U+FFFD instead of failing
+            decode_options = {'encoding': 'utf-8', 'encoding_errors': 'replace'}
+            
+            # Sniff the delimiter from the first 4KB, then parse a sample of rows with
+            # the C engine; the sample drives column selection before the full read
             csv_data = None
             delimiter_used = None
+            read_options = decode_options
             
-            # Parse with different delimiters
-            delimiters = [',', ';', '\t', '|']
-            for delimiter in delimiters:
-                try:
-                    csv_data = pd.read_csv(
-                        io.StringIO(file_content), 
-                        delimiter=delimiter,
-                        skipinitialspace=True,
-                        skip_blank_lines=True
-                    )
-                    if len(csv_data.columns) > 1 and not csv_data.empty:
-                        delimiter_used = delimiter
-                        print(f"✅ Successfully parsed with delimiter: '{delimiter}'")
-                        break
-                except Exception as e:
-                    print(f"❌ Failed with delimiter '{delimiter}': {str(e)}")
-                    continue
+            try:
+                delimiter = csv.Sniffer().sniff(head.decode('utf-8', 'replace'), delimiters=',;\t|').delimiter
+                sniffed_options = {
+                    **decode_options,
+                    'sep': delimiter,
+                    'engine': 'c',
+                    'skipinitialspace': True,
+                    'skip_blank_lines': True
+                }
+                file_content.seek(0)
+                csv_data = pd.read_csv(file_content, nrows=CSV_SAMPLE_ROWS, **sniffed_options)
+                if len(csv_data.columns) > 1 and not csv_data.empty:
+                    delimiter_used = delimiter
+                    read_options = sniffed_options
+                    log.debug("✅ Successfully parsed with delimiter: '%s'", delimiter)
+            except Exception as e:
+                log.debug("❌ Delimiter sniffing failed: %s", e)
             
             # Final fallback - let pandas auto-detect
             if csv_data is None or csv_data.empty or len(csv_data.columns) <= 1:
                 try:
-                    csv_data = pd.read_csv(io.StringIO(file_content))
+                    file_content.seek(0)
+                    csv_data = pd.read_csv(file_content, nrows=CSV_SAMPLE_ROWS, **decode_options)
                     delimiter_used = 'auto-detected'
-                    print("✅ Successfully parsed with auto-detection")
+                    log.debug("✅ Successfully parsed with auto-detection")
                 except Exception as e:
-                    print(f"❌ Auto-detection failed: {str(e)}")
+                    log.warning("❌ Auto-detection failed: %s", e)
                     return jsonify({
                         'error': f'Could not parse CSV file: {str(e)}'
                     }), 400
             
-            print(f"📊 CSV loaded: {csv_data.shape[0]} rows, {csv_data.shape[1]} columns")
-            print(f"📋 All CSV columns: {list(csv_data.columns)}")
+            log.debug("📊 CSV sample loaded: %d rows, %d columns", csv_data.shape[0], csv_data.shape[1])
+            log.debug("📋 All CSV columns: %s", list(csv_data.columns))
             
         except Exception as e:
-            print(f"❌ Error reading CSV: {str(e)}")
+            log.warning("❌ Error reading CSV: %s", e)
             return jsonify({
                 'error': f'Error reading CSV file: {str(e)}'
             }), 400
@@ -234,54 +531,15 @@ def predict_csv():
         
         # SMART COLUMN SELECTION - Drop unwanted columns first
         try:
-            print("🔍 Starting intelligent column selection...")
+            log.debug("🔍 Starting intelligent column selection...")
             
             # Clean column names
             csv_data.columns = [str(col).strip() for col in csv_data.columns]
             available_columns = list(csv_data.columns)
             
-            # Define columns to exclude (case-insensitive)
-            exclude_patterns = [
-                'id', 'diagnosis', 'target', 'label', 'class', 'outcome', 'result',
-                'patient', 'sample', 'index', 'unnamed', 'row'
-            ]
+            excluded_columns, numeric_columns = select_feature_columns(csv_data)
             
-            # Filter out excluded columns
-            feature_candidates = []
-            excluded_columns = []
-            
-            for col in available_columns:
-                col_lower = col.lower().strip()
-                should_exclude = any(pattern in col_lower for pattern in exclude_patterns)
-                
-                if should_exclude:
-                    excluded_columns.append(col)
-                    print(f"🗑️ Excluding column: {col}")
-                else:
-                    feature_candidates.append(col)
-            
-            print(f"📊 Feature candidates: {len(feature_candidates)} columns")
-            print(f"🗑️ Excluded columns: {excluded_columns}")
-            
-            # Test which columns are numeric
-            numeric_columns = []
-            for col in feature_candidates:
-                try:
-                    # Try to convert to numeric
-                    numeric_test = pd.to_numeric(csv_data[col], errors='coerce')
-                    valid_ratio = numeric_test.notna().sum() / len(numeric_test)
-                    
-                    if valid_ratio >= 0.9:  # At least 90% valid numeric values
-                        numeric_columns.append(col)
-                        print(f"✅ Numeric column: {col} ({valid_ratio:.1%} valid)")
-                    else:
-                        print(f"❌ Non-numeric column: {col} ({valid_ratio:.1%} valid)")
-                        
-                except Exception as e:
-                    print(f"❌ Error testing column {col}: {str(e)}")
-                    continue
-            
-            print(f"🔢 Found {len(numeric_columns)} numeric columns")
+            log.debug("🔢 Found %d numeric columns", len(numeric_columns))
             
             # Check if we have enough features
             if len(numeric_columns) < expected_features:
@@ -291,91 +549,94 @@ def predict_csv():
             
             # Select exactly the number of features the model expects
             selected_columns = numeric_columns[:expected_features]
-            print(f"✅ Selected {len(selected_columns)} columns: {selected_columns}")
-            
-            # Create final feature dataset
-            features_data = csv_data[selected_columns].copy()
-            
-            # Convert to numeric and handle any remaining non-numeric values
-            for col in selected_columns:
-                features_data[col] = pd.to_numeric(features_data[col], errors='coerce')
-            
-            # Handle missing values
-            if features_data.isnull().any().any():
-                print("⚠️ Found missing values, filling with column medians")
-                features_data = features_data.fillna(features_data.median())
-            
-            # Final conversion to float
-            features_data = features_data.astype(float)
-            
-            print(f"📊 Final dataset shape: {features_data.shape}")
-            print(f"📈 Sample row: {features_data.iloc[0].values[:5].tolist()}")
+            log.debug("✅ Selected %d columns: %s", len(selected_columns), selected_columns)
             
         except Exception as e:
-            print(f"❌ Error in column selection: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Error in column selection: %s", e)
             return jsonify({
                 'error': f'Error processing CSV columns: {str(e)}'
             }), 400
         
         # Validate final feature count - FIXED
-        if features_data.shape[1] != expected_features:
+        if len(selected_columns) != expected_features:
             return jsonify({
-                'error': f'Expected {expected_features} features, got {features_data.shape[1]} features.'
+                'error': f'Expected {expected_features} features, got {len(selected_columns)} features.'
             }), 400
         
-        print(f"🎯 Ready for prediction: {features_data.shape} samples × {features_data.shape[1]} features")
-        
-        # Scale features using trained scaler
+        # Stream the full file in chunks: parse on a background thread, predict here
         try:
-            features_scaled = scaler.transform(features_data.values)
-            print(f"⚖️ Features scaled successfully")
+            selected_set = set(selected_columns)
+            file_content.seek(0)
+            reader = pd.read_csv(
+                file_content,
+                usecols=lambda col: str(col).strip() in selected_set,
+                chunksize=CSV_CHUNK_ROWS,
+                **read_options
+            )
+            
+            chunk_features = []
+            chunk_probabilities = []
+            for chunk in iter_in_background(reader):
+                chunk.columns = [str(col).strip() for col in chunk.columns]
+                features = chunk[selected_columns]
+                if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in features.dtypes):
+                    features = features.apply(pd.to_numeric, errors='coerce')
+                X = features.to_numpy(dtype=np.float32, copy=False)
+                chunk_features.append(X)
+                # Chunks with missing values wait for the medians of the whole file
+                chunk_probabilities.append(None if np.isnan(X).any() else predict_proba(X.copy()))
+            
+            # Handle missing values: medians only for the columns that contain NaNs
+            deferred = [i for i, p in enumerate(chunk_probabilities) if p is None]
+            if deferred:
+                log.debug("⚠️ Found missing values, filling with column medians")
+                col_has_nan = np.logical_or.reduce([np.isnan(chunk_features[i]).any(axis=0) for i in deferred])
+                for c in np.flatnonzero(col_has_nan):
+                    column_values = np.concatenate([X[:, c] for X in chunk_features])
+                    if np.isnan(column_values).all():
+                        return jsonify({
+                            'error': f'Column {selected_columns[c]} has no numeric values.'
+                        }), 400
+                    median = np.nanmedian(column_values)
+                    for i in deferred:
+                        column = chunk_features[i][:, c]
+                        np.copyto(column, median, where=np.isnan(column))
+                for i in deferred:
+                    chunk_probabilities[i] = predict_proba(chunk_features[i])
+            
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("📊 Final dataset shape: (%d, %d)", sum(len(X) for X in chunk_features), len(selected_columns))
         except Exception as e:
-            print(f"❌ Error scaling features: {str(e)}")
+            log.warning("❌ Error reading CSV rows: %s", e)
             return jsonify({
-                'error': f'Error scaling features: {str(e)}'
+                'error': f'Error processing CSV rows: {str(e)}'
             }), 400
         
-        # Make predictions using trained model
+        # Make predictions using trained model (scaling happens inside predict_proba)
         try:
-            predictions = model.predict(features_scaled)
-            print(f"🔮 Predictions completed: {len(predictions)} results")
+            probabilities = np.concatenate(chunk_probabilities)
+            predictions = probabilities.argmax(axis=1)
+            confidences = np.max(probabilities, axis=1, out=confidence_buffer(len(probabilities)))
+            log.debug("🔮 Predictions completed: %d results", len(predictions))
         except Exception as e:
-            print(f"❌ Error making predictions: {str(e)}")
+            log.exception("❌ Error making predictions: %s", e)
             return jsonify({
                 'error': f'Error making predictions: {str(e)}'
             }), 400
         
-        # Get prediction probabilities for confidence
-        try:
-            probabilities = model.predict_proba(features_scaled)
-            confidences = np.max(probabilities, axis=1)
-            print("📊 Confidence scores calculated")
-        except Exception as e:
-            print(f"⚠️ Could not calculate confidence: {str(e)}")
-            confidences = [0.85] * len(predictions)
-        
-        # Format results
-        results = []
-        malignant_count = 0
-        benign_count = 0
-        
-        for pred, conf in zip(predictions, confidences):
-            result = "Malignant" if pred == 1 else "Benign"
-            if pred == 1:
-                malignant_count += 1
-            else:
-                benign_count += 1
-                
-            results.append({
-                'prediction': result,
-                'confidence': float(conf)
-            })
+        # Format results (labels and confidences converted in bulk, encoded with orjson)
+        malignant = predictions == 1
+        malignant_count = int(np.count_nonzero(malignant))
+        benign_count = len(predictions) - malignant_count
+        labels = np.where(malignant, "Malignant", "Benign").tolist()
+        results = [
+            {'prediction': label, 'confidence': conf}
+            for label, conf in zip(labels, confidences.tolist())
+        ]
         
-        print(f"✅ Final Results: {benign_count} Benign, {malignant_count} Malignant")
+        log.info("✅ Final Results: %d Benign, %d Malignant", benign_count, malignant_count)
         
-        return jsonify({
+        payload = orjson.dumps({
             'predictions': results,
             'total_samples': len(results),
             'benign_count': benign_count,
@@ -387,11 +648,12 @@ def predict_csv():
             'delimiter_used': delimiter_used,
             'status': 'success'
         })
+        return Response(payload, mimetype='application/json')
         
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Critical error in predict_csv: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Critical error in predict_csv: %s", e)
         return jsonify({
             'error': f'CSV prediction failed: {str(e)}'
         }), 500
@@ -402,7 +664,7 @@ def health_check():
     status = {
         'status': 'healthy',
         'model_loaded': model is not None,
-        'scaler_loaded': scaler is not None,
+        'scaler_loaded': MEAN is not None,
         'expected_features': expected_features,
         'feature_columns_available': len(FEATURE_COLUMNS)
     }
@@ -416,6 +678,10 @@ def not_found(error):
 def method_not_allowed(error):
     return jsonify({'error': 'Method not allowed'}), 405
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'error': 'Request is too large'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
@@ -423,8 +689,8 @@ def internal_error(error):
 if __name__ == "__main__":
     import os
     port = int(os.environ.get('PORT', 5000))
-    print("🚀 Starting Breast Cancer Prediction Server...")
-    print(f"📊 Model expects: {expected_features} features")
-    print(f"📋 Using columns: {FEATURE_COLUMNS}")
-    print(f"🌐 Server will be available on port {port}")
+    log.info("🚀 Starting Breast Cancer Prediction Server...")
+    log.info("📊 Model expects: %d features", expected_features)
+    log.info("📋 Using columns: %s", FEATURE_COLUMNS)
+    log.info("🌐 Server will be available on port %d", port)
     app.run(debug=False, host='0.0.0.0', port=port)
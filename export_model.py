@@ -0,0 +1,78 @@
+"""Export the trained model.pkl / scaler.pkl into inference-friendly artifacts.
+
+Produces:
+    model.onnx  - the classifier compiled to ONNX (served with onnxruntime)
+    scaler.npz  - StandardScaler mean/scale as float32 arrays
+
+and re-dumps model.pkl / scaler.pkl with pickle.HIGHEST_PROTOCOL for the
+pickle fallback path.
+
+Run once after retraining (requires scikit-learn and skl2onnx):
+    python export_model.py
+
+Pass --int8 to also write model.int8.onnx with ONNX Runtime dynamic
+quantization (served when the app runs with USE_INT8_MODEL=1). Only graphs
+built from ai.onnx-domain MatMul/Gemm ops (e.g. MLPClassifier) can be
+quantized; skl2onnx exports tree ensembles and linear models such as
+LogisticRegression as single ai.onnx.ml operators, which are left as float32.
+"""
+import sys
+import pickle
+import numpy as np
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+
+def repickle(obj, path):
+    """Re-dump a pickled artifact with the highest protocol (protocol 5 buffers for NumPy arrays)"""
+    with open(path, "wb", buffering=1024 * 1024) as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"✅ Re-pickled {path} with protocol {pickle.HIGHEST_PROTOCOL}")
+
+
+def export_scaler(scaler, path="scaler.npz"):
+    """Save the scaler statistics as plain float32 arrays"""
+    np.savez(
+        path,
+        mean=np.ascontiguousarray(scaler.mean_, dtype=np.float32),
+        scale=np.ascontiguousarray(scaler.scale_, dtype=np.float32),
+    )
+    print(f"✅ Scaler exported to {path}")
+
+
+def export_model(model, n_features, path="model.onnx"):
+    """Compile the classifier to ONNX with a plain probability tensor output"""
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[("input", FloatTensorType([None, n_features]))],
+        options={id(model): {"zipmap": False}},
+    )
+    with open(path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+    print(f"✅ Model exported to {path}")
+
+
+def quantize_model(src="model.onnx", dst="model.int8.onnx"):
+    """Write an int8 dynamically quantized copy of the ONNX model"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    try:
+        quantize_dynamic(src, dst, weight_type=QuantType.QInt8)
+    except ValueError as e:
+        print(f"⚠️ ONNX graph has no ai.onnx-domain operators to quantize (ai.onnx.ml only), keeping float32: {e}")
+        return
+    print(f"✅ Quantized model exported to {dst}")
+
+
+if __name__ == "__main__":
+    with open("model.pkl", "rb") as f:
+        model = pickle.load(f)
+    with open("scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+
+    repickle(model, "model.pkl")
+    repickle(scaler, "scaler.pkl")
+    export_scaler(scaler)
+    export_model(model, scaler.n_features_in_)
+    if "--int8" in sys.argv[1:]:
+        quantize_model()
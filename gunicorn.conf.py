@@ -0,0 +1,16 @@
+"""Gunicorn settings for serving app:app (picked up automatically from the project root)"""
+import multiprocessing
+import os
+
+# One BLAS/OpenMP thread per worker thread; parallelism comes from workers x threads
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import app.py once in the master so workers share the loaded model copy-on-write
+preload_app = True